@@ -1,6 +1,26 @@
-from gym.envs.registration import register
+import logging
+import sys
 
-register(
-    id='BinPack3D-v0',
-    entry_point='gym_BinPack3D.envs:PackingGame',
-)
+# library stays quiet unless the application configures logging
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+ENV_ID = 'BinPack3D-v0'
+
+def register_envs():
+    """
+    register the env to gym
+
+    called by gym itself through the "gym.envs" entry point in setup.py,
+    so importing this package does not need to import gym
+    """
+    from gym.envs.registration import register, registry
+
+    if ENV_ID in getattr(registry, "env_specs", registry): return
+    register(
+        id=ENV_ID,
+        entry_point='gym_BinPack3D.envs:PackingGame',
+    )
+
+# gym already loaded, possibly without the entry point (e.g. package not pip installed)
+if "gym" in sys.modules:
+    register_envs()
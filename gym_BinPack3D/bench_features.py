@@ -0,0 +1,76 @@
+import sys
+import time
+
+import numpy as np
+
+from gym_BinPack3D.envs.BinPack3DEnv import PackingGame
+from gym_BinPack3D.envs.Container import Box, Rotate
+from gym_BinPack3D.envs.HeightMapFeatures import HeightMapFeatures
+
+"""
+Time the incremental feature plane update against an env step
+
+    python -m gym_BinPack3D.bench_features
+
+Random episodes of PackingGame(genFeaturePlanes=False) are played with valid actions.
+After each step HeightMapFeatures.update is run for the box just placed, so both are
+timed on the same height maps, interleaved so machine load affects them alike.
+
+Exit code is 1 if update takes more than MAX_STEP_FRACTION of a step in any case.
+"""
+
+MAX_STEP_FRACTION = 0.5
+
+CASES = {
+    "10x10, 4 boxes, 2 rotations" : ((10,10,10), [Rotate.NOOP, Rotate.XY]),
+    "20x20, 4 boxes, 2 rotations" : ((20,20,20), [Rotate.NOOP, Rotate.XY]),
+    "20x20, 4 boxes, 4 rotations" : ((20,20,20), [Rotate.NOOP, Rotate.XY, Rotate.XZ, Rotate.YZ]),
+}
+
+BOX_SET = [Box(1,1,1), Box(2,3,4), Box(3,3,2), Box(5,2,1)]
+
+
+def measure(container_size, enabled_rotations, box_set=BOX_SET, n_episodes=30, seed=0):
+    """
+    return tuple (mean env step time, mean update time) per placed box, in seconds
+    """
+    rng = np.random.default_rng(seed)
+    env = PackingGame(container_size=container_size, box_set=box_set,
+                      enabled_rotations=enabled_rotations, genFeaturePlanes=False)
+    env.seed(seed)
+    features = HeightMapFeatures(env.container, box_set, enabled_rotations) # updated here, not by the env
+
+    tStep = tUpdate = 0.0
+    n = 0
+    for episode in range(n_episodes):
+        obs = env.reset()
+        features.reset()
+        while True:
+            candidates = np.argwhere(obs["valid_placement_mask"])
+            if len(candidates) == 0: break
+            r, x, y = candidates[rng.integers(len(candidates))]
+            action = (env.position_to_actionIdx((x, y)), enabled_rotations[r])
+
+            t0 = time.perf_counter()
+            obs, reward, done, info = env.step(action)
+            t1 = time.perf_counter()
+            box = env.container.boxes[-1]
+            features.update(box.x, box.x+box.dx, box.y, box.y+box.dy)
+            t2 = time.perf_counter()
+            tStep += t1 - t0
+            tUpdate += t2 - t1
+            n += 1
+            if done: break
+    return tStep / n, tUpdate / n
+
+
+if __name__=="__main__":
+    ok = True
+    for name, (container_size, enabled_rotations) in CASES.items():
+        tStep, tUpdate = measure(container_size, enabled_rotations)
+        fraction = tUpdate / tStep
+        passed = fraction <= MAX_STEP_FRACTION
+        ok &= passed
+        print(f"{name:30s} step {tStep*1e6:8.1f} us  update {tUpdate*1e6:8.1f} us  "
+              f"update/step {fraction:4.2f}  target {MAX_STEP_FRACTION}  {'OK' if passed else 'MISSED'}")
+    sys.exit(0 if ok else 1)
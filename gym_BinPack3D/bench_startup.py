@@ -0,0 +1,71 @@
+import json
+import subprocess
+import sys
+
+"""
+Check the startup cost paid by every worker process against targets
+
+    python -m gym_BinPack3D.bench_startup
+
+cold import  : import in a fresh interpreter, best of n_repeat, numpy's own import time subtracted
+env creation : PackingGame(...) in an interpreter that already imported the package
+
+Exit code is 1 if any target is missed.
+"""
+
+# seconds
+TARGETS = {
+    "import gym_BinPack3D.core"       : 0.030,
+    "construct PackingGame random"    : 0.005,
+    "construct PackingGame CUT-1"     : 0.010,
+    "construct PackingGame CUT-2"     : 0.020,
+}
+
+_IMPORT_SNIPPET = """
+import time, sys
+import numpy
+t0 = time.perf_counter()
+import {module}
+print(time.perf_counter() - t0)
+assert "gym" not in sys.modules and "matplotlib" not in sys.modules, "core pulled in gym or matplotlib"
+"""
+
+_ENV_SNIPPET = """
+import time, json
+from gym_BinPack3D.envs.BinPack3DEnv import PackingGame
+out = {{}}
+for gen in ("random", "CUT-1", "CUT-2"):
+    best = float("inf")
+    for i in range({n_repeat}):
+        t0 = time.perf_counter()
+        PackingGame(container_size=(10, 10, 10), boxSeqGenerator=gen)
+        best = min(best, time.perf_counter() - t0)
+    out["construct PackingGame " + gen] = best
+print(json.dumps(out))
+"""
+
+
+def _run(snippet):
+    out = subprocess.run([sys.executable, "-c", snippet], check=True, capture_output=True, text=True)
+    return out.stdout.strip().splitlines()[-1]
+
+
+def measure(n_repeat=5):
+    """
+    return dict, name in TARGETS -> best time in seconds
+    """
+    results = {}
+    results["import gym_BinPack3D.core"] = min(
+        float(_run(_IMPORT_SNIPPET.format(module="gym_BinPack3D.core"))) for i in range(n_repeat) )
+    results.update(json.loads(_run(_ENV_SNIPPET.format(n_repeat=n_repeat))))
+    return results
+
+
+if __name__=="__main__":
+    results = measure()
+    ok = True
+    for name, target in TARGETS.items():
+        passed = results[name] <= target
+        ok &= passed
+        print(f"{name:32s} {results[name]*1000:8.2f} ms  target {target*1000:6.1f} ms  {'OK' if passed else 'MISSED'}")
+    sys.exit(0 if ok else 1)
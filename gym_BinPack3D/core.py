@@ -0,0 +1,9 @@
+"""
+The packing core: containers, boxes, box sequence generators, the placement mask kernel
+and the height map feature planes
+
+Only needs numpy, importing it does not load gym or matplotlib.
+"""
+from gym_BinPack3D.envs.Container import Box, Container, Rotate, placement_mask
+from gym_BinPack3D.envs.BoxSeqGenerator import BoxSeqGenerator, RandomBoxCreator, CuttingBoxCreator
+from gym_BinPack3D.envs.HeightMapFeatures import HeightMapFeatures, compute_feature_planes
@@ -2,12 +2,15 @@ import gym
 from gym import error, spaces, utils
 from gym.utils import seeding
 
+import logging
 import numpy as np
 import copy
 
 from gym_BinPack3D.envs.Container import Container, Box
 from gym_BinPack3D.envs.BoxSeqGenerator import BoxSeqGenerator, RandomBoxCreator, CuttingBoxCreator, Rotate
 
+logger = logging.getLogger(__name__)
+
 
 class PackingGame(gym.Env):
     """
@@ -37,6 +40,7 @@ class PackingGame(gym.Env):
                     minSideLen = None,
                     maxSideLen = None,
                     genValidPlacementMask = True,
+                    genFeaturePlanes = False,
                     #data_name = None,  #TODO: load saved box seq
                     **kwags):
         """
@@ -46,6 +50,12 @@ class PackingGame(gym.Env):
         [Rotate.NOOP, Rotate.XY]
         [Rotate.NOOP, Rotate.XY, Rotate.XZ]
         [Rotate.NOOP, Rotate.XY, Rotate.XZ, Rotate.YZ]
+
+        genFeaturePlanes: add height map feature planes to obs as "feature_planes",
+        see gym_BinPack3D/envs/HeightMapFeatures.py, box types are from box_set.
+        Its "n_fit" plane counts rotated sizes of the boxes separately; the number of
+        boxes of box_set that still fit anywhere, under any enabled rotation, is added
+        to obs as "n_box_types_fit"
         """
 
         self.container_size = container_size
@@ -61,21 +71,22 @@ class PackingGame(gym.Env):
         if type(boxSeqGenerator) is str:
             assert box_set is not None
             if boxSeqGenerator == 'random':
-                print('using random box sequence')
+                logger.debug('using random box sequence')
                 self.boxSeqGenerator = RandomBoxCreator(box_set, self.enabled_rotations, n_foreseeable_box)
             elif boxSeqGenerator == 'CUT-1':
-                print('using CUT-1 logic box sequence')
+                logger.debug('using CUT-1 logic box sequence')
                 self.boxSeqGenerator = CuttingBoxCreator(container_size, minSideLen, maxSideLen, "ByZ",
                                                          self.enabled_rotations, n_foreseeable_box
                                                          )
             elif boxSeqGenerator == 'CUT-2':
-                print('using CUT-2 logic box sequence')
+                logger.debug('using CUT-2 logic box sequence')
                 self.boxSeqGenerator = CuttingBoxCreator(container_size, minSideLen, maxSideLen, "ByStackOrder",
                                                          self.enabled_rotations, n_foreseeable_box,
                                                          )
         assert isinstance(self.boxSeqGenerator, BoxSeqGenerator)    
 
         self.genValidPlacementMask = genValidPlacementMask
+        self.genFeaturePlanes = genFeaturePlanes
 
         obsSpace = {
             "height_map"   : gym.spaces.Box(low=0.0, high=self.container_size[2], shape=(self.container_size[0],self.container_size[1]) ),
@@ -85,6 +96,12 @@ class PackingGame(gym.Env):
         if self.genValidPlacementMask:
             obsSpace["valid_placement_mask"] = gym.spaces.MultiBinary( [len(self.enabled_rotations), self.container_size[0],self.container_size[1] ])
 
+        if self.genFeaturePlanes:
+            features = self.container.enable_features(self.box_set, self.enabled_rotations)
+            high = max(4*self.container_size[2], self.container_area, len(features.boxTypes))
+            obsSpace["feature_planes"] = gym.spaces.Box(low=0.0, high=high, shape=features.planes.shape )
+            obsSpace["n_box_types_fit"] = gym.spaces.Discrete( len(self.box_set)+1 )
+
         self.action_space = gym.spaces.MultiDiscrete( [self.container_area, len(self.enabled_rotations)] )
         self.observation_space = gym.spaces.Dict(obsSpace)
         
@@ -131,6 +148,9 @@ class PackingGame(gym.Env):
                 "coming_boxes" : coming_boxes
                }
         if self.genValidPlacementMask: obs["valid_placement_mask"] = mask
+        if self.genFeaturePlanes:
+            obs["feature_planes"] = self.container.features.get_planes()
+            obs["n_box_types_fit"] = self.container.features.n_box_types_fit()
         
         return obs
 
@@ -144,17 +164,26 @@ class PackingGame(gym.Env):
 
         succeeded = self.container.drop_box(box, position)
 
+        invalid_reason = None
         if succeeded:
             self.boxSeqGenerator.pop_box() # remove current box from the list
             reward = (box.dx*box.dy*box.dz) / self.container_vol * 10
             done = False
         else:            
+            invalid_reason = self.container.get_placement_invalid_reason(box, position)
             reward = 0.0
             done = True
         
-        info = {'counter':len(self.container.boxes), 'ratio':self.container.get_fill_ratio()}
+        info = {'counter':len(self.container.boxes), 'ratio':self.container.get_fill_ratio(), 'invalid_reason':invalid_reason}
         return self.cur_observation, reward, done, info
     
+    def seed(self, seed=None):
+        """
+        seed the box sequence generator, takes effect from the next reset()
+        """
+        self.boxSeqGenerator.set_seed(seed)
+        return [seed]
+
     def reset(self):
         self.boxSeqGenerator.reset()
         self.container.reset()
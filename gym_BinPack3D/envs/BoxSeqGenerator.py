@@ -1,11 +1,11 @@
+import logging
 import numpy as np
 import copy
 from gym_BinPack3D.envs.Container import Box, Container, Rotate
 
+logger = logging.getLogger(__name__)
 
 
-#FIXME proper seed for rand nums
-
 class BoxSeqGenerator(object):
     def __init__(self, enabled_rotations = None, n_foreseeable_box = None, seed=None):
         """
@@ -19,14 +19,18 @@ class BoxSeqGenerator(object):
         self.enabled_rotations = enabled_rotations
         self.n_foreseeable_box = n_foreseeable_box
 
-        self.seed = seed
-        if seed is None:
-            self.rng = np.random.default_rng(seed)
-        else:
-            self.rng = np.random.default_rng()
+        self.set_seed(seed)
 
         self.reset()
 
+    def set_seed(self, seed=None):
+        """
+        re-create the random num generator, seed=None gives an unpredictable one
+        the box seq takes effect from the next reset()
+        """
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
     def reset(self):
         self.box_list.clear()
         self._gen_more_boxes()
@@ -63,8 +67,7 @@ class RandomBoxCreator(BoxSeqGenerator):
         self.box_set = box_set
         super().__init__(*args, **kw)
 
-        print ("Box to be sampled:")
-        for b in self.box_set: print (b)
+        logger.debug("Box to be sampled: %s", self.box_set)
 
     def _gen_more_boxes(self):
         while len(self.box_list)<self.n_foreseeable_box:
@@ -157,8 +160,7 @@ class CuttingBoxCreator(BoxSeqGenerator):
             boxA.dz, boxB.dz = splitPos, box.dz-splitPos
             boxB.z += splitPos
         else:
-            print(f"Unknow action {action}")
-            raise ValueError
+            raise ValueError(f"Unknow action {action}")
 
         self._cut_box(boxA)
         self._cut_box(boxB)
@@ -188,9 +190,7 @@ class CuttingBoxCreator(BoxSeqGenerator):
                 
                 if idx>=len(self.box_list):
                     if not placedOnce: 
-                        print ("All boxes left cannot be placed")
-                        raise ValueError
-                        break
+                        raise ValueError("All boxes left cannot be placed")
                     idx=0
                     placedOnce = False
             assert container.get_fill_ratio() == 1.0
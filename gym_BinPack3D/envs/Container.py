@@ -48,6 +48,66 @@ class Box(object):
     def __repr__(self):
         return f"Box: Size {self.dx} {self.dy} {self.dz} Position {self.x} {self.y} {self.z}"
 
+def _support_rules(corners, max_h, max_area, area):
+    """
+    stability rules of check_box_placement_valid, element wise
+    corners  : heights under the 4 corners of the box base, stacked on the first axis
+    max_h    : max height under the box base
+    max_area : cells under the box base at max_h
+    area     : cells under the box base
+    """
+    rm = corners.max(axis=0)
+    supportedCorners = (corners == rm).sum(axis=0)
+    ratio = max_area / area
+
+    # supported part of the base needed: 95%, or with the corners at max_h 85% for 3 of
+    # them and 50% for all 4
+    need = np.where(rm == max_h, np.where(supportedCorners == 4, 0.50, 0.85), 0.95)
+    return (supportedCorners >= 3) & (ratio > need)
+
+def placement_support(heightMap, bx, by):
+    """
+    the part of placement_mask that does not depend on the box height,
+    shared by boxes of the same base
+
+    heightMap : array of shape (..., X, Y), X >= bx and Y >= by
+    bx,by     : base of the box
+
+    return tuple of arrays of shape (..., X-bx+1, Y-by+1)
+        ok       : base corners and area are well supported
+        max_h    : height the box base would rest at
+        max_area : cells supporting the box base
+    """
+    win = np.lib.stride_tricks.sliding_window_view(heightMap, (bx, by), axis=(-2, -1))
+    max_h = win.max(axis=(-2, -1))
+    max_area = (win == max_h[..., None, None]).sum(axis=(-2, -1))
+    corners = np.stack([win[..., 0, 0], win[..., -1, 0], win[..., 0, -1], win[..., -1, -1]])
+    ok = _support_rules(corners, max_h, max_area, bx * by)
+    return ok, max_h, max_area
+
+def placement_mask(heightMap, bx, by, bz, max_z, checkMode="normal"):
+    """
+    vectorized Container.check_box_placement_valid over all positions at once
+
+    heightMap : array of shape (..., X, Y), a height map, a sub-region of it,
+                or a stack of height maps to be checked in one go
+    bx,by,bz  : size of the box
+    max_z     : height of the container
+
+    return int32 array of shape (..., X-bx+1, Y-by+1),
+    1 where the deepest-leftmost corner of the box can be placed
+    (empty if the box does not fit in heightMap)
+    """
+    nx = max(0, heightMap.shape[-2] - bx + 1)
+    ny = max(0, heightMap.shape[-1] - by + 1)
+    if nx == 0 or ny == 0 or bx <= 0 or by <= 0:
+        return np.zeros(shape=heightMap.shape[:-2] + (nx, ny), dtype=np.int32)
+
+    ok, max_h, max_area = placement_support(heightMap, bx, by)
+    valid = ok & (max_h + bz <= max_z)
+    if checkMode == "strict": valid &= (max_area >= bx * by)
+    return valid.astype(np.int32)
+
 class Container(object):
     def __init__(self, dx=10, dy=10, dz=10):
         self.boxes = []
@@ -55,10 +115,23 @@ class Container(object):
         self.dy = dy
         self.dz = dz
         self.heightMap = np.zeros(shape=(dx, dy), dtype=np.int32)
+        self.features = None
 
     def reset(self):
         self.boxes = []
         self.heightMap[:,:] = 0
+        if self.features is not None: self.features.reset()
+
+    def enable_features(self, box_set, enabled_rotations=None):
+        """
+        keep height map feature planes up to date on every drop_box, see HeightMapFeatures
+
+        box_set           : list of obj of type "Box", box types counted in the "n_fit" plane
+        enabled_rotations : list of Enum Rotate
+        """
+        from gym_BinPack3D.envs.HeightMapFeatures import HeightMapFeatures
+        self.features = HeightMapFeatures(self, box_set, enabled_rotations)
+        return self.features
 
     def regen_height_map(self):
         heightMap = np.zeros_like(self.heightMap)
@@ -101,9 +174,30 @@ class Container(object):
 
         at "strict" check the box must be supported 100% below its base
         """
+        h, _ = self._check_box_placement(box, pos, checkMode)
+        return h
+
+    def get_placement_invalid_reason(self, box, pos, checkMode="normal"):
+        """
+        return None if placement is good
+        return a str telling why the placement is invalid otherwise, one of
+            "out_of_container"      : box sticks out of the container sideway
+            "unstable_corners"      : less than 3 corners of the box base are supported
+            "exceed_height"         : box hit the top of the container
+            "insufficient_support"  : too little of the box base is supported
+        """
+        _, reason = self._check_box_placement(box, pos, checkMode)
+        return reason
+
+    def _check_box_placement(self, box, pos, checkMode="normal"):
+        """
+        return tuple (height, reason)
+        height is -1 and reason is a str if placement is invalid, see get_placement_invalid_reason
+        height is that of the box base and reason is None if placement is good
+        """
         x, y = pos
-        if x+box.dx > self.dx or y+box.dy > self.dy: return -1
-        if x < 0 or y < 0: return -1
+        if x+box.dx > self.dx or y+box.dy > self.dy: return -1, "out_of_container"
+        if x < 0 or y < 0: return -1, "out_of_container"
 
         rec = self.heightMap[x:x+box.dx, y:y+box.dy]
         r00 = rec[ 0, 0]
@@ -112,40 +206,35 @@ class Container(object):
         r11 = rec[-1,-1]
         rm = max(r00,r10,r01,r11)
         supportedCorners = int(r00==rm)+int(r10==rm)+int(r01==rm)+int(r11==rm)
-        if supportedCorners < 3: return -1
+        if supportedCorners < 3: return -1, "unstable_corners"
 
         max_h = np.max(rec)
         assert max_h >= 0
-        if max_h + box.dz > self.dz: return -1
+        if max_h + box.dz > self.dz: return -1, "exceed_height"
         
         # check box base is well supported
         max_area = np.sum(rec==max_h)
         area = box.dx * box.dy
 
-        if checkMode == "strict" and max_area<area: return -1
+        if checkMode == "strict" and max_area<area: return -1, "insufficient_support"
 
         if max_area/area > 0.95: 
-            return max_h
+            return max_h, None
         if rm == max_h and supportedCorners == 3 and max_area/area > 0.85:
-            return max_h
+            return max_h, None
         if rm == max_h and supportedCorners == 4 and max_area/area > 0.50:
-            return max_h
+            return max_h, None
 
-        return -1
+        return -1, "insufficient_support"
 
-    def get_possible_positions(self, box):
+    def get_possible_positions(self, box, checkMode="normal"):
         """
         find possible position to place the incoming box, 
         the position shoulf satisfy stability and be accessable
         """
         action_mask = np.zeros(shape=(self.dx, self.dy), dtype=np.int32)
-        
-        for i in range(self.dx-box.dx+1):
-            for j in range(self.dy-box.dy+1):
-                pos = (i,j)
-                if self.check_box_placement_valid(box, pos) >= 0:
-                    action_mask[i, j] = 1
-
+        valid = placement_mask(self.heightMap, box.dx, box.dy, box.dz, self.dz, checkMode)
+        action_mask[:valid.shape[0], :valid.shape[1]] = valid
         return action_mask
 
     def drop_box(self, box, pos):
@@ -159,6 +248,7 @@ class Container(object):
         box.x, box.y, box.z = x, y, new_h
         self.boxes.append(copy.deepcopy(box))
         self.heightMap = self.update_height_map(self.heightMap, box)
+        if self.features is not None: self.features.update(x, x+box.dx, y, y+box.dy)
         return True
 
     @staticmethod
@@ -0,0 +1,261 @@
+import csv
+import math
+import os
+import time
+import multiprocessing as mp
+from collections import Counter
+
+import numpy as np
+
+from gym_BinPack3D.envs.BinPack3DEnv import PackingGame
+from gym_BinPack3D.envs.Container import Box, Rotate
+
+"""
+Evaluate a policy over many seeded episodes of PackingGame
+
+Episodes are sharded over a worker pool, each finished episode is appended
+as one row to a csv file right away, so an interrupted run can be resumed by
+calling evaluate() again with the same out_path: episodes already in the file
+are skipped and folded into the aggregate statistics.
+
+Aggregates are running (count, mean, std, min, max) per config, so memory
+does not grow with the number of episodes.
+"""
+
+FIELDS = [  "episode_id", "config", "seed",
+            "n_boxes", "fill_ratio", "total_reward", "invalid_reason",
+            "n_steps", "mean_step_latency", "max_step_latency" ]
+
+NUMERIC_FIELDS = [  "n_boxes", "fill_ratio", "total_reward",
+                    "n_steps", "mean_step_latency", "max_step_latency" ]
+
+
+def random_valid_policy(env, obs, rng):
+    """
+    pick uniformly among the valid placements of the first coming box
+    env must be created with genValidPlacementMask = True
+
+    return action tuple (position idx, Rotate)
+    return None if there is no valid placement, which ends the episode
+    """
+    candidates = np.argwhere(obs["valid_placement_mask"] > 0)
+    if len(candidates) == 0:
+        return None
+    r, x, y = candidates[rng.integers(len(candidates))]
+    return (env.position_to_actionIdx((x, y)), env.enabled_rotations[r])
+
+
+def make_episode_specs(configs, seeds):
+    """
+    configs : dict, config name -> kwargs of PackingGame
+    seeds   : iterable of int
+
+    return list of tuple (episode_id, config name, seed)
+    """
+    seeds = list(seeds)
+    return [ (f"{name}/{seed}", name, seed) for name in configs for seed in seeds ]
+
+
+class RunningStats(object):
+    """
+    Welford's online mean / variance, plus min and max
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def std(self):
+        if self.count < 2: return 0.0
+        return math.sqrt(self.m2 / (self.count - 1))
+
+    def summary(self):
+        return {"count":self.count, "mean":self.mean, "std":self.std, "min":self.min, "max":self.max}
+
+
+class EvalAggregator(object):
+    """
+    aggregate statistics of episode rows, grouped by config
+    """
+    def __init__(self):
+        self.stats = {}
+        self.invalid_reasons = {}
+
+    def add(self, row):
+        config = row["config"]
+        if config not in self.stats:
+            self.stats[config] = { f: RunningStats() for f in NUMERIC_FIELDS }
+            self.invalid_reasons[config] = Counter()
+        for f in NUMERIC_FIELDS:
+            self.stats[config][f].add(float(row[f]))
+        self.invalid_reasons[config][row["invalid_reason"] or "none"] += 1
+
+    def summary(self):
+        out = {}
+        for config, stats in self.stats.items():
+            out[config] = { f: s.summary() for f, s in stats.items() }
+            out[config]["invalid_reason"] = dict(self.invalid_reasons[config])
+        return out
+
+
+def run_episode(env, seed, policy=random_valid_policy, max_steps=None):
+    """
+    play one episode of env with policy, the box sequence and policy are seeded by seed
+
+    policy returning None ends the episode with invalid_reason "no_valid_placement"
+
+    return dict with the per-episode metrics in FIELDS (except the id fields)
+    """
+    rng = np.random.default_rng(seed)
+    env.seed(seed)
+    obs = env.reset()
+
+    total_reward = 0.0
+    latencies = []
+    invalid_reason = None
+    while max_steps is None or len(latencies) < max_steps:
+        action = policy(env, obs, rng)
+        if action is None:
+            invalid_reason = "no_valid_placement"
+            break
+        t0 = time.perf_counter()
+        obs, reward, done, info = env.step(action)
+        latencies.append(time.perf_counter() - t0)
+        total_reward += reward
+        if done:
+            invalid_reason = info["invalid_reason"]
+            break
+
+    return {
+        "n_boxes"           : len(env.container.boxes),
+        "fill_ratio"        : env.container.get_fill_ratio(),
+        "total_reward"      : total_reward,
+        "invalid_reason"    : invalid_reason or "",
+        "n_steps"           : len(latencies),
+        "mean_step_latency" : float(np.mean(latencies)) if latencies else 0.0,
+        "max_step_latency"  : float(np.max(latencies))  if latencies else 0.0,
+    }
+
+
+# per worker process state, set by _init_worker
+_worker = {}
+
+def _init_worker(configs, policy, max_steps):
+    _worker["configs"] = configs
+    _worker["policy"] = policy
+    _worker["max_steps"] = max_steps
+    _worker["envs"] = {}
+
+def _run_spec(spec):
+    episode_id, config, seed = spec
+    envs = _worker["envs"]
+    if config not in envs:
+        envs[config] = PackingGame(**_worker["configs"][config])
+    row = run_episode(envs[config], seed, _worker["policy"], _worker["max_steps"])
+    row.update({"episode_id":episode_id, "config":config, "seed":seed})
+    return row
+
+
+def _drop_partial_last_line(out_path, block=4096):
+    """
+    a run killed mid-write can leave a truncated last row, drop it so that episode is rerun
+    """
+    if not os.path.exists(out_path): return
+    with open(out_path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            chunk = f.read(pos - start)
+            if pos == end and chunk.endswith(b"\n"): return
+            idx = chunk.rfind(b"\n")
+            if idx >= 0:
+                f.truncate(start + idx + 1)
+                return
+            pos = start
+        f.truncate(0)
+
+
+def _load_finished(out_path, aggregator, wanted):
+    """
+    read back an existing result file, feed its rows to aggregator
+    rows of episodes not in the set wanted are ignored
+
+    return set of finished episode ids
+    """
+    finished = set()
+    if not os.path.exists(out_path): return finished
+    with open(out_path, newline="") as f:
+        for row in csv.DictReader(f):
+            if row["episode_id"] not in wanted or row["episode_id"] in finished: continue
+            finished.add(row["episode_id"])
+            aggregator.add(row)
+    return finished
+
+
+def evaluate(configs, seeds, out_path, policy=random_valid_policy, n_workers=None, max_steps=None, chunksize=1):
+    """
+    configs   : dict, config name -> kwargs of PackingGame, e.g.
+                {"cut2_10" : dict(container_size=(10,10,10), boxSeqGenerator="CUT-2")}
+    seeds     : iterable of int, every config is played once per seed
+    out_path  : str, csv file that per-episode rows are appended to
+    policy    : func (env, obs, rng) -> action or None, must be picklable when n_workers != 0
+    n_workers : int, size of worker pool, None = cpu count, 0 = run in this process
+    max_steps : int or None, cap on steps per episode
+
+    when resuming, only rows of the requested configs and seeds are reused and reported,
+    the file is assumed to come from the same policy and max_steps
+
+    return aggregate summary of the requested episodes, see EvalAggregator.summary
+    """
+    _drop_partial_last_line(out_path)
+    aggregator = EvalAggregator()
+    specs = make_episode_specs(configs, seeds)
+    finished = _load_finished(out_path, aggregator, set(s[0] for s in specs))
+    specs = [ s for s in specs if s[0] not in finished ]
+
+    with open(out_path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if f.tell() == 0:
+            writer.writeheader()
+            f.flush()
+
+        def consume(rows):
+            for row in rows:
+                writer.writerow(row)
+                f.flush()
+                aggregator.add(row)
+
+        if n_workers == 0:
+            _init_worker(configs, policy, max_steps)
+            consume(map(_run_spec, specs))
+        else:
+            with mp.Pool(n_workers, initializer=_init_worker, initargs=(configs, policy, max_steps)) as pool:
+                consume(pool.imap_unordered(_run_spec, specs, chunksize))
+
+    return aggregator.summary()
+
+
+if __name__=="__main__":
+    configs = {
+        "random_10" : dict(container_size=(10,10,10), boxSeqGenerator="random",
+                           enabled_rotations=[Rotate.NOOP, Rotate.XY],
+                           box_set=[Box(1,1,1), Box(2,3,4)]),
+        "cut1_10"   : dict(container_size=(10,10,10), boxSeqGenerator="CUT-1"),
+        "cut2_10"   : dict(container_size=(10,10,10), boxSeqGenerator="CUT-2"),
+    }
+    summary = evaluate(configs, range(8), "eval_results.csv")
+    for config, stats in summary.items():
+        print(config, stats["fill_ratio"], stats["invalid_reason"])
@@ -0,0 +1,289 @@
+import numpy as np
+
+from gym_BinPack3D.envs.Container import Box, Rotate, placement_mask, _support_rules
+
+"""
+Feature planes derived from Container.heightMap, kept up to date box by box
+
+Planes, each of shape (container dx, dy), stacked in the order of PLANES:
+    gap       : max over the 4 neighbours of (neighbour height - own height), floored at 0
+    roughness : sum over the 4 neighbours of |neighbour height - own height|
+    flat_area : area of the largest flat rectangle with its deepest-leftmost corner at the cell,
+                i.e. extending to +x and +y, all at the height of the cell
+    n_fit     : number of box types that can be placed with their deepest-leftmost corner at the cell
+
+Neighbours outside the container are ignored.
+A box type is a box of box_set under one of the enabled rotations, so n_fit counts rotated
+sizes: a box fitting both as is and rotated counts twice. The number of boxes of box_set
+that still fit anywhere, under any rotation, is n_box_types_fit().
+
+After drop_box changes the region [le,ri) x [up,do) of the height map only the cells
+whose features depend on that region are recomputed:
+    gap, roughness : the region plus a 1 cell border
+    flat_area      : cells with x < ri and y < do
+    n_fit          : cells with le-BX < x < ri and up-BY < y < do, BX,BY the largest box base
+
+Everything a recomputation gathers from the height map is addressed by index arrays
+built once per container, so an update is a fixed few dozen numpy calls over the region.
+
+compute_feature_planes() is the reference full recomputation.
+Compare the cost of the update with an env step with
+    python -m gym_BinPack3D.bench_features
+"""
+
+PLANES = ["gap", "roughness", "flat_area", "n_fit"]
+
+
+def get_box_types(box_set, enabled_rotations=None):
+    """
+    return list of tuple (index in box_set, dx, dy, dz), one per distinct rotated box size
+    """
+    if enabled_rotations is None: enabled_rotations = [Rotate.NOOP]
+    boxTypes = []
+    for idx, b in enumerate(box_set):
+        for r in enabled_rotations:
+            box = Box(b.dx, b.dy, b.dz)
+            box.rotate(r)
+            t = (idx, box.dx, box.dy, box.dz)
+            if t not in boxTypes: boxTypes.append(t)
+    return boxTypes
+
+
+def gap_and_roughness(heightMap):
+    """
+    return (gap, roughness) planes of heightMap, see module doc
+    """
+    h = heightMap.astype(np.int32)
+    # padded with the edge cells, a neighbour outside the container is the cell itself
+    p = np.empty((h.shape[0]+2, h.shape[1]+2), dtype=np.int32)
+    p[1:-1, 1:-1] = h
+    p[0], p[-1], p[:, 0], p[:, -1] = p[1], p[-2], p[:, 1], p[:, -2]
+    d = np.stack([p[2:, 1:-1], p[:-2, 1:-1], p[1:-1, 2:], p[1:-1, :-2]]) - h # neighbour minus self
+    return np.maximum(d.max(axis=0), 0), np.abs(d).sum(axis=0)
+
+
+def flat_runs(heightMap):
+    """
+    runY[x,y] = number of cells from (x,y) to +y having the same height as (x,y)
+    """
+    dy = heightMap.shape[1]
+    cols = np.arange(dy)
+    # last column of the run each cell is in
+    runEnd = np.where(heightMap[:, :-1] != heightMap[:, 1:], cols[:-1], dy-1)
+    runEnd = np.minimum.accumulate(np.concatenate([runEnd, np.full((heightMap.shape[0], 1), dy-1)], axis=1)[:, ::-1], axis=1)[:, ::-1]
+    return (runEnd - cols + 1).astype(np.int32)
+
+
+def flat_area(heightMap, runY, ri=None, do=None):
+    """
+    return flat_area plane for the cells [0,ri) x [0,do), see module doc
+    """
+    dx, dy = heightMap.shape
+    if ri is None: ri = dx
+    if do is None: do = dy
+    h = np.concatenate([heightMap, np.full((1, dy), -1, dtype=heightMap.dtype)])
+    runs = np.concatenate([runY, np.zeros((1, dy), dtype=runY.dtype)])
+    return _flat_area(h, runs, _flat_area_rows(dx)[:, :ri], do)
+
+
+def _flat_area_rows(dx):
+    """
+    rows[k,x] = row x+k, capped at row dx past the container
+    """
+    return np.minimum(np.arange(dx)[:, None] + np.arange(dx)[None, :], dx)
+
+
+def _flat_area(h, runs, rows, do):
+    """
+    flat_area for the anchor rows of rows and the columns [0,do)
+
+    h, runs : heightMap and runY, followed by a row of height -1 past the container
+    rows    : see _flat_area_rows
+    """
+    h = h[rows, :do]
+    # width of the rectangle k+1 rows high, 0 from the first row not at the anchor height on
+    width = np.minimum.accumulate(np.where(h == h[0], runs[rows, :do], 0), axis=0)
+    return (width * np.arange(1, len(rows)+1, dtype=width.dtype)[:, None, None]).max(axis=0)
+
+
+def compute_feature_planes(heightMap, max_z, boxTypes):
+    """
+    reference full recomputation of the feature planes
+
+    heightMap : 2D array
+    max_z     : height of the container
+    boxTypes  : list of tuple (index in box_set, dx, dy, dz), see get_box_types
+
+    return int32 array of shape (len(PLANES), dx, dy)
+    """
+    dx, dy = heightMap.shape
+    planes = np.zeros((len(PLANES), dx, dy), dtype=np.int32)
+    planes[0], planes[1] = gap_and_roughness(heightMap)
+    planes[2] = flat_area(heightMap, flat_runs(heightMap))
+    for _, bx, by, bz in boxTypes:
+        mask = placement_mask(heightMap, bx, by, bz, max_z)
+        planes[3, :mask.shape[0], :mask.shape[1]] += mask
+    return planes
+
+
+class HeightMapFeatures(object):
+    """
+    feature planes of a Container, updated incrementally by Container.drop_box
+    see module doc for the planes
+
+    container         : obj of type "Container"
+    box_set           : list of obj of type "Box"
+    enabled_rotations : list of Enum Rotate
+    """
+    def __init__(self, container, box_set, enabled_rotations=None):
+        self.container = container
+        self.box_set = box_set
+        self.boxTypes = get_box_types(box_set, enabled_rotations)
+
+        dx, dy = container.dx, container.dy
+        self.planes = np.zeros((len(PLANES), dx, dy), dtype=np.int32)
+
+        # flat indices of the 4 neighbours of every cell, outside the container the cell itself,
+        # and of the cell itself so the gap is floored at 0
+        xs, ys = np.arange(dx)[:, None], np.arange(dy)[None, :]
+        self.neighbourIdx = np.stack([ np.minimum(xs+1, dx-1)*dy + ys, np.maximum(xs-1, 0)*dy + ys,
+                                       xs*dy + np.minimum(ys+1, dy-1), xs*dy + np.maximum(ys-1, 0),
+                                       xs*dy + ys ])
+
+        # runY with a row of 0 past the container, for _flat_area
+        self.runs = np.zeros((dx+1, dy), dtype=np.int32)
+        self.runY = self.runs[:dx]
+        self.flatRows = _flat_area_rows(dx)
+
+        # box types sharing a base share the support computation
+        self.fitBases = sorted(set( (bx, by) for _, bx, by, _ in self.boxTypes ))
+        self.typeBase = np.array([ self.fitBases.index((bx, by)) for _, bx, by, _ in self.boxTypes ], dtype=int)
+        self.typeLimit = np.array([ container.dz - bz for _, _, _, bz in self.boxTypes ], dtype=np.int32)
+        self.fitMasks = np.zeros((dx, dy, len(self.boxTypes)), dtype=bool)
+        self._build_fit_index()
+        self.reset()
+
+    def _build_fit_index(self):
+        """
+        the height map is kept in padded, with -1 on the far sides so every anchor has a
+        window of every base, and at least one row past the container for _flat_area
+
+        the cells under the bases are gathered with one take() of precomputed flat indices
+            cellIdx   : (dx, dy, sum of base areas), cells of base g start at cellStart[g]
+            cornerIdx : (4, dx, dy, len(fitBases)), corners 00, 10, 01, 11 of each base
+        """
+        dx, dy = self.runY.shape
+        BX = max([ bx for bx, by in self.fitBases ], default=1)
+        BY = max([ by for bx, by in self.fitBases ], default=1)
+        self.padded = np.full((dx+BX, dy+BY-1), -1, dtype=np.int32)
+        PY = self.padded.shape[1]
+        self.fitBorder = (BX-1, BY-1)
+
+        gbx = np.array([ bx for bx, by in self.fitBases ], dtype=int)
+        gby = np.array([ by for bx, by in self.fitBases ], dtype=int)
+        anchor = np.arange(dx)[:, None] * PY + np.arange(dy)[None, :]
+        cells = [ i*PY + j for bx, by in self.fitBases for i in range(bx) for j in range(by) ]
+        corners = np.array([ 0*gbx, (gbx-1)*PY, gby-1, (gbx-1)*PY + gby-1 ], dtype=int)
+        self.cellIdx = anchor[:, :, None] + np.array(cells, dtype=int)
+        self.cornerIdx = anchor[None, :, :, None] + corners[:, None, None, :]
+
+        self.baseArea = gbx * gby
+        self.cellStart = np.concatenate([[0], np.cumsum(self.baseArea)[:-1]]).astype(int)
+        self.cellBase = np.repeat(np.arange(len(self.fitBases)), self.baseArea)
+
+    def reset(self):
+        """
+        full recomputation from the container's current height map
+        """
+        h = self.container.heightMap
+        dx, dy = h.shape
+        self.padded[:dx, :dy] = h
+        self.runY[:, :] = flat_runs(h)
+        self._update_gap_and_roughness(0, dx, 0, dy)
+        self.planes[2] = _flat_area(self.padded, self.runs, self.flatRows, dy)
+        self._update_fit_masks(0, dx, 0, dy)
+
+    def update(self, le, ri, up, do):
+        """
+        update features after the height map changed in region [le,ri) x [up,do)
+        """
+        h = self.container.heightMap
+        dx, dy = h.shape
+        self.padded[le:ri, up:do] = h[le:ri, up:do]
+
+        # gap, roughness: region plus 1 cell border
+        self._update_gap_and_roughness(max(0, le-1), min(dx, ri+1), max(0, up-1), min(dy, do+1))
+
+        # flat_area: cells with x < ri and y < do
+        self.runY[le:ri] = flat_runs(h[le:ri])
+        self.planes[2, :ri, :do] = _flat_area(self.padded, self.runs, self.flatRows[:, :ri], do)
+
+        # n_fit: anchors of boxes overlapping the region
+        self._update_fit_masks(max(0, le-self.fitBorder[0]), ri, max(0, up-self.fitBorder[1]), do)
+
+    def _update_gap_and_roughness(self, x0, x1, y0, y1):
+        """
+        recompute the gap and roughness planes for the cells [x0,x1) x [y0,y1)
+        """
+        h = self.container.heightMap
+        d = h.take(self.neighbourIdx[:, x0:x1, y0:y1]) - h[x0:x1, y0:y1] # neighbour minus self
+        self.planes[0, x0:x1, y0:y1] = d.max(axis=0)
+        self.planes[1, x0:x1, y0:y1] = np.abs(d).sum(axis=0)
+
+    def _update_fit_masks(self, x0, x1, y0, y1):
+        """
+        recompute fitMasks and the n_fit plane for the anchors [x0,x1) x [y0,y1),
+        all box bases at once
+        """
+        if not self.fitBases: return
+        cells = self.padded.take(self.cellIdx[x0:x1, y0:y1])
+        corners = self.padded.take(self.cornerIdx[:, x0:x1, y0:y1])
+        max_h = np.maximum.reduceat(cells, self.cellStart, axis=-1)
+        max_area = np.add.reduceat(cells == max_h.take(self.cellBase, axis=-1), self.cellStart, axis=-1, dtype=np.int32)
+        # a base sticking out of the container has its far corners in the padding, below
+        # its near corner, so it fails the corner rule
+        ok = _support_rules(corners, max_h, max_area, self.baseArea)
+
+        fit = np.where(ok, max_h, self.container.dz + 1).take(self.typeBase, axis=-1) <= self.typeLimit
+        self.fitMasks[x0:x1, y0:y1] = fit
+        self.planes[3, x0:x1, y0:y1] = fit.sum(axis=-1)
+
+    def get_planes(self):
+        return self.planes.copy()
+
+    def full_recompute(self):
+        """
+        reference planes recomputed from scratch, should always equal get_planes()
+        """
+        return compute_feature_planes(self.container.heightMap, self.container.dz, self.boxTypes)
+
+    def n_box_types_fit(self):
+        """
+        number of boxes in box_set that can still be placed somewhere, under any enabled rotation
+        """
+        typeFits = self.fitMasks.any(axis=(0, 1))
+        fits = set( self.boxTypes[t][0] for t in range(len(self.boxTypes)) if typeFits[t] )
+        return len(fits)
+
+    def largest_flat_area_by_height(self):
+        """
+        return dict, height -> area of the largest flat rectangle at that height
+        """
+        h = self.container.heightMap
+        return { int(z): int(self.planes[2][h == z].max()) for z in np.unique(h) }
+
+
+if __name__=="__main__":
+    from gym_BinPack3D.envs.Container import Container
+
+    rng = np.random.default_rng(0)
+    box_set = [Box(1,1,1), Box(2,3,4), Box(3,3,2), Box(5,2,1)]
+    for trial in range(200):
+        container = Container(*rng.integers(3, 12, 3))
+        container.enable_features(box_set, [Rotate.NOOP, Rotate.XY, Rotate.YZ])
+        for i in range(30):
+            box = Box(*rng.integers(1, 5, 3))
+            pos = tuple(rng.integers(0, 10, 2))
+            container.drop_box(box, pos)
+            assert (container.features.get_planes() == container.features.full_recompute()).all()
+    print("incremental feature planes match full recomputation")
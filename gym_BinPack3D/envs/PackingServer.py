@@ -0,0 +1,387 @@
+import asyncio
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+from gym_BinPack3D.envs.Container import Box, Container, Rotate, placement_mask
+
+"""
+Local asyncio server that decides where to place boxes, for many packing stations at once
+
+Protocol: one json object per line, both ways, over a TCP or Unix socket.
+Every request may carry an "id", which is echoed in its response so a client
+can pipeline requests.
+
+    {"op":"open",  "session":"s1", "container_size":[10,10,10]}
+    {"op":"place", "session":"s1", "box":[2,3,4], "rotations":["NOOP","XY"]}
+        -> {"ok":true, "position":[x,y], "z":z, "rotation":"XY"}
+    {"op":"close", "session":"s1"}
+    {"op":"stats"}
+
+Session requests are queued and processed in micro-batches: place requests of
+the batch whose height maps and boxes have the same shape are stacked and their
+valid masks computed in one placement_mask call. Candidates are scored by
+lowest resulting box top, then deepest (small x), then leftmost (small y).
+
+Malformed requests get error "bad_request"; an unexpected failure answers the
+requests concerned with error "internal_error" and the server keeps running.
+
+Backpressure: each connection has a bounded number of requests in flight,
+beyond which the server stops reading from it; when the shared queue is full
+requests are rejected at once with error "overloaded".
+"""
+
+class ServerMetrics(object):
+    """
+    counters plus latency of the last n_latency requests, in seconds
+    """
+    def __init__(self, n_latency=10000):
+        self.start_time = time.perf_counter()
+        self.n_requests = 0
+        self.n_rejected = 0
+        self.n_batches = 0
+        self.n_batched_requests = 0
+        self.latencies = deque(maxlen=n_latency)
+
+    def add_batch(self, batch):
+        self.n_batches += 1
+        self.n_batched_requests += len(batch)
+
+    def add_latency(self, latency):
+        self.n_requests += 1
+        self.latencies.append(latency)
+
+    def summary(self):
+        uptime = time.perf_counter() - self.start_time
+        lat = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            "uptime"           : uptime,
+            "n_requests"       : self.n_requests,
+            "n_rejected"       : self.n_rejected,
+            "n_batches"        : self.n_batches,
+            "mean_batch_size"  : self.n_batched_requests / max(1, self.n_batches),
+            "throughput"       : self.n_requests / uptime,
+            "latency_mean"     : float(lat.mean()),
+            "latency_p50"      : float(np.percentile(lat, 50)),
+            "latency_p99"      : float(np.percentile(lat, 99)),
+            "latency_max"      : float(lat.max()),
+        }
+
+
+class PackingServer(object):
+    """
+    max_batch    : int, max requests processed together
+    max_delay    : float, seconds to wait for more requests before processing a batch
+    max_queue    : int, requests waiting to be batched, beyond which requests are rejected
+    max_inflight : int, unanswered requests per connection before the server stops reading it
+    """
+    def __init__(self, max_batch=64, max_delay=0.002, max_queue=1024, max_inflight=64):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_inflight = max_inflight
+        self.sessions = {}
+        self.metrics = ServerMetrics()
+
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._server = None
+        self._batcher = None
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """
+        listen on Unix socket path if given, else on TCP host:port (port=0 picks a free one)
+        return the address listened on
+        """
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=path)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self._batcher = asyncio.ensure_future(self._batch_loop())
+        return self._server.sockets[0].getsockname()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+
+    async def _handle_connection(self, reader, writer):
+        inflight = asyncio.Semaphore(self.max_inflight)
+        writeLock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(req, fut, t0):
+            try:
+                resp = await fut
+            finally:
+                inflight.release()
+            self.metrics.add_latency(time.perf_counter() - t0)
+            await send(req, resp)
+
+        async def send(req, resp):
+            # copy, responses may be shared between requests
+            if isinstance(req, dict) and "id" in req: resp = dict(resp, id=req["id"])
+            async with writeLock:
+                writer.write((json.dumps(resp) + "\n").encode())
+                await writer.drain()
+
+        try:
+            while True:
+                await inflight.acquire()
+                line = await reader.readline()
+                if not line:
+                    inflight.release()
+                    break
+                t0 = time.perf_counter()
+
+                try:
+                    req = json.loads(line)
+                except ValueError:
+                    req = None
+                op = req.get("op") if isinstance(req, dict) else None
+                if op is None:
+                    inflight.release()
+                    await send(req, {"ok":False, "error":"bad_request"})
+                    continue
+
+                if op == "stats":
+                    inflight.release()
+                    await send(req, {"ok":True, "stats":self.metrics.summary()})
+                    continue
+
+                if not isinstance(req.get("session"), str):
+                    inflight.release()
+                    await send(req, {"ok":False, "error":"bad_request", "detail":"session must be a str"})
+                    continue
+
+                fut = asyncio.get_running_loop().create_future()
+                try:
+                    self._queue.put_nowait((req, fut))
+                except asyncio.QueueFull:
+                    inflight.release()
+                    self.metrics.n_rejected += 1
+                    await send(req, {"ok":False, "error":"overloaded"})
+                    continue
+
+                task = asyncio.ensure_future(respond(req, fut, t0))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks: await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0: break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.metrics.add_batch(batch)
+            # sessions are only touched here, one batch at a time, so no locking is needed
+            try:
+                results = await loop.run_in_executor(None, self.process_batch, [req for req, _ in batch])
+            except Exception as e:
+                results = [ {"ok":False, "error":"internal_error", "detail":repr(e)} for _ in batch ]
+            for (_, fut), resp in zip(batch, results):
+                if not fut.done(): fut.set_result(resp)
+
+    def process_batch(self, reqs):
+        """
+        process a list of session requests, return list of responses in the same order
+
+        requests of one session are applied in order: the batch is split in rounds
+        where each session appears at most once, and each round is processed together
+        """
+        results = [None] * len(reqs)
+        pending = list(range(len(reqs)))
+        while pending:
+            seen = set()
+            thisRound, pending_ = [], []
+            for i in pending:
+                session = reqs[i].get("session")
+                if session in seen:
+                    pending_.append(i)
+                else:
+                    seen.add(session)
+                    thisRound.append(i)
+            pending = pending_
+
+            places = []
+            for i in thisRound:
+                try:
+                    resp = self._process_one(reqs[i])
+                except Exception as e:
+                    resp = {"ok":False, "error":"bad_request", "detail":repr(e)}
+                if resp is None:
+                    places.append(i)
+                else:
+                    results[i] = resp
+
+            try:
+                placed = self._place_together([reqs[i] for i in places])
+            except Exception as e:
+                placed = [ {"ok":False, "error":"internal_error", "detail":repr(e)} for _ in places ]
+            for i, resp in zip(places, placed):
+                results[i] = resp
+        return results
+
+    def _process_one(self, req):
+        """
+        handle open / close, validate place requests
+        return response, or None for a valid place request
+        """
+        op = req["op"]
+        session = req["session"]
+        if op == "open":
+            dx, dy, dz = (int(v) for v in req["container_size"])
+            if min(dx, dy, dz) < 1: raise ValueError("container_size must be >= 1")
+            self.sessions[session] = Container(dx, dy, dz)
+            return {"ok":True}
+        if op == "close":
+            self.sessions.pop(session, None)
+            return {"ok":True}
+        if op == "place":
+            if session not in self.sessions: return {"ok":False, "error":"unknown_session"}
+            dx, dy, dz = (int(v) for v in req["box"])
+            if min(dx, dy, dz) < 1: raise ValueError("box size must be >= 1")
+            for r in req.get("rotations", ["NOOP"]): Rotate[r] # KeyError on unknown rotation
+            return None
+        return {"ok":False, "error":"unknown_op"}
+
+    def _place_together(self, reqs):
+        """
+        compute the masks and candidate scores for place requests of distinct sessions,
+        place each box at its best candidate
+
+        return list of responses
+        """
+        # expand every request to one candidate per rotation, group candidates by shape
+        groups = {}
+        for i, req in enumerate(reqs):
+            container = self.sessions[req["session"]]
+            for r in req.get("rotations", ["NOOP"]):
+                box = Box(*(int(v) for v in req["box"]))
+                box.rotate(Rotate[r])
+                key = (container.dx, container.dy, container.dz, box.dx, box.dy, box.dz)
+                groups.setdefault(key, []).append((i, r))
+
+        # best ((top, x, y), rotation) per request, compared in container coordinates
+        best = [None] * len(reqs)
+        for (cx, cy, cz, bx, by, bz), members in groups.items():
+            heightMaps = np.stack([ self.sessions[reqs[i]["session"]].heightMap for i, _ in members ])
+            masks = placement_mask(heightMaps, bx, by, bz, cz)
+            if masks.size == 0: continue
+            win = np.lib.stride_tricks.sliding_window_view(heightMaps, (bx, by), axis=(-2, -1))
+            tops = win.max(axis=(-2, -1)).astype(np.int64) + bz
+
+            # lowest top first, then deepest, then leftmost, within this group
+            nx, ny = masks.shape[1:]
+            order = np.arange(nx * ny).reshape(nx, ny)
+            scores = np.where(masks > 0, tops * (nx * ny) + order, np.iinfo(np.int64).max)
+            flat = scores.reshape(len(members), -1)
+            idx = flat.argmin(axis=1)
+            for m, ((i, r), k) in enumerate(zip(members, idx)):
+                if masks[m].reshape(-1)[k] == 0: continue
+                x, y = int(k // ny), int(k % ny)
+                candidate = (int(tops[m, x, y]), x, y)
+                if best[i] is None or candidate < best[i][0]:
+                    best[i] = (candidate, r)
+
+        results = []
+        for req, b in zip(reqs, best):
+            if b is None:
+                results.append({"ok":False, "error":"no_valid_placement"})
+                continue
+            (_, x, y), r = b
+            box = Box(*(int(v) for v in req["box"]))
+            box.rotate(Rotate[r])
+            container = self.sessions[req["session"]]
+            if not container.drop_box(box, (x, y)):
+                results.append({"ok":False, "error":"internal_error", "detail":"chosen placement rejected"})
+                continue
+            results.append({"ok":True, "position":[x, y], "z":int(container.boxes[-1].z), "rotation":r})
+        return results
+
+
+class PackingClient(object):
+    """
+    asyncio client of PackingServer, requests can be issued concurrently
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._futures = {}
+        self._nextId = 0
+        self._readTask = asyncio.ensure_future(self._read_loop())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=None, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _read_loop(self):
+        while True:
+            line = await self.reader.readline()
+            if not line: break
+            resp = json.loads(line)
+            fut = self._futures.pop(resp.get("id"), None)
+            if fut is not None and not fut.done(): fut.set_result(resp)
+        for fut in self._futures.values():
+            if not fut.done(): fut.set_exception(ConnectionError("server closed connection"))
+
+    async def request(self, op, **kw):
+        reqId = self._nextId
+        self._nextId += 1
+        fut = asyncio.get_running_loop().create_future()
+        self._futures[reqId] = fut
+        self.writer.write((json.dumps(dict(kw, op=op, id=reqId)) + "\n").encode())
+        await self.writer.drain()
+        return await fut
+
+    async def close(self):
+        self.writer.close()
+        self._readTask.cancel()
+
+
+if __name__=="__main__":
+    async def station(port, name, n_boxes, rng):
+        client = await PackingClient.connect(port=port)
+        await client.request("open", session=name, container_size=[10,10,10])
+        n_placed = 0
+        for i in range(n_boxes):
+            box = [int(v) for v in rng.integers(1, 4, 3)]
+            resp = await client.request("place", session=name, box=box, rotations=["NOOP", "XY"])
+            if resp["ok"]: n_placed += 1
+        await client.request("close", session=name)
+        await client.close()
+        return n_placed
+
+    async def main():
+        server = PackingServer()
+        host, port = await server.start()
+        rng = np.random.default_rng(0)
+        placed = await asyncio.gather(*[ station(port, f"station{i}", 50, rng) for i in range(32) ])
+        print("boxes placed per station:", placed)
+        client = await PackingClient.connect(port=port)
+        print((await client.request("stats"))["stats"])
+        await client.close()
+        await server.close()
+
+    asyncio.run(main())
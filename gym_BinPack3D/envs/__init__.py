@@ -1,2 +1,10 @@
-from gym_BinPack3D.envs.BinPack3DEnv import PackingGame
 from gym_BinPack3D.envs.Container import Box, Rotate
+
+__all__ = ["Box", "Rotate", "PackingGame"]
+
+def __getattr__(name):
+    # the gym wrapper is loaded on first use, so the packing core does not pull in gym
+    if name == "PackingGame":
+        from gym_BinPack3D.envs.BinPack3DEnv import PackingGame
+        return PackingGame
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
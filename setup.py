@@ -2,5 +2,7 @@ from setuptools import setup
 
 setup(name='gym_BinPack3D',
       version='0.1',
-      install_requires=['gym', 'numpy']  # And any other dependencies foo needs
-)
\ No newline at end of file
+      install_requires=['gym', 'numpy'],  # And any other dependencies foo needs
+      # gym registers the env through this on its own import, see gym_BinPack3D.register_envs
+      entry_points={'gym.envs': ['__root__ = gym_BinPack3D:register_envs']},
+)
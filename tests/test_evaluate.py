@@ -0,0 +1,84 @@
+import csv
+
+from gym_BinPack3D.envs.Container import Box, Rotate
+from gym_BinPack3D.envs.Evaluate import evaluate, _drop_partial_last_line
+
+CONFIGS = {
+    "random_6" : dict(container_size=(6,6,6), boxSeqGenerator="random",
+                      enabled_rotations=[Rotate.NOOP, Rotate.XY],
+                      box_set=[Box(1,1,1), Box(2,3,4)]),
+    "cut1_6"   : dict(container_size=(6,6,6), boxSeqGenerator="CUT-1"),
+}
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_random_policy_ends_with_no_valid_placement(tmp_path):
+    out = tmp_path / "res.csv"
+    summary = evaluate({"random_6":CONFIGS["random_6"]}, range(4), str(out), n_workers=0)
+    assert summary["random_6"]["invalid_reason"] == {"no_valid_placement": 4}
+
+
+def test_resume_skips_finished_and_matches_full_run(tmp_path):
+    full = tmp_path / "full.csv"
+    ref = evaluate(CONFIGS, range(4), str(full), n_workers=0)
+
+    part = tmp_path / "part.csv"
+    evaluate(CONFIGS, range(2), str(part), n_workers=0)
+    resumed = evaluate(CONFIGS, range(4), str(part), n_workers=0)
+
+    rows = read_rows(part)
+    assert len(rows) == 8
+    assert len(set(r["episode_id"] for r in rows)) == 8
+    for config in CONFIGS:
+        assert resumed[config]["fill_ratio"]["mean"] == ref[config]["fill_ratio"]["mean"]
+        assert resumed[config]["n_boxes"]["count"] == 4
+
+
+def test_resume_ignores_rows_of_other_episodes(tmp_path):
+    out = tmp_path / "res.csv"
+    evaluate(CONFIGS, range(3), str(out), n_workers=0)
+    summary = evaluate({"cut1_6":CONFIGS["cut1_6"]}, range(2), str(out), n_workers=0)
+    assert list(summary) == ["cut1_6"]
+    assert summary["cut1_6"]["n_boxes"]["count"] == 2
+
+
+def test_resume_reruns_truncated_last_row(tmp_path):
+    out = tmp_path / "res.csv"
+    evaluate(CONFIGS, range(2), str(out), n_workers=0)
+    data = out.read_bytes()
+    out.write_bytes(data[:-10])
+
+    summary = evaluate(CONFIGS, range(2), str(out), n_workers=0)
+    rows = read_rows(out)
+    assert len(rows) == 4
+    assert sum(s["n_boxes"]["count"] for s in summary.values()) == 4
+    assert out.read_bytes().endswith(b"\n")
+
+
+def test_drop_partial_last_line(tmp_path):
+    path = tmp_path / "f.csv"
+
+    path.write_bytes(b"a,b\n1,2\n3,")
+    _drop_partial_last_line(str(path))
+    assert path.read_bytes() == b"a,b\n1,2\n"
+
+    # already complete, untouched
+    _drop_partial_last_line(str(path))
+    assert path.read_bytes() == b"a,b\n1,2\n"
+
+    # partial line longer than the read block
+    path.write_bytes(b"a,b\n" + b"x" * 50)
+    _drop_partial_last_line(str(path), block=8)
+    assert path.read_bytes() == b"a,b\n"
+
+    # no newline at all
+    path.write_bytes(b"abc")
+    _drop_partial_last_line(str(path))
+    assert path.read_bytes() == b""
+
+    # missing file is fine
+    _drop_partial_last_line(str(tmp_path / "missing.csv"))
@@ -0,0 +1,75 @@
+import numpy as np
+
+from gym_BinPack3D.envs.Container import Box, Container, Rotate, placement_mask
+from gym_BinPack3D.envs.HeightMapFeatures import flat_area, flat_runs
+
+
+def brute_force_flat_area(h):
+    X, Y = h.shape
+    out = np.zeros_like(h)
+    for i in range(X):
+        for j in range(Y):
+            for a in range(i+1, X+1):
+                for b in range(j+1, Y+1):
+                    if (h[i:a, j:b] == h[i, j]).all(): out[i, j] = max(out[i, j], (a-i)*(b-j))
+    return out
+
+
+def test_flat_area_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for trial in range(200):
+        h = rng.integers(0, 2, rng.integers(1, 7, 2))
+        assert (flat_area(h, flat_runs(h)) == brute_force_flat_area(h)).all()
+
+
+def test_fit_masks_match_placement_mask():
+    rng = np.random.default_rng(0)
+    for trial in range(100):
+        container = Container(*rng.integers(1, 9, 3))
+        box_set = [ Box(*rng.integers(1, 6, 3)) for i in range(rng.integers(1, 5)) ]
+        features = container.enable_features(box_set, [Rotate.NOOP, Rotate.XZ])
+        for i in range(10):
+            container.drop_box(Box(*rng.integers(1, 4, 3)), tuple(rng.integers(0, 8, 2)))
+            for t, (_, bx, by, bz) in enumerate(features.boxTypes):
+                mask = placement_mask(container.heightMap, bx, by, bz, container.dz)
+                expected = np.zeros(container.heightMap.shape, dtype=bool)
+                expected[:mask.shape[0], :mask.shape[1]] = mask > 0
+                assert (features.fitMasks[:, :, t] == expected).all()
+
+
+def test_incremental_update_matches_full_recomputation():
+    rng = np.random.default_rng(1)
+    box_set = [Box(1,1,1), Box(2,3,4), Box(3,3,2), Box(5,2,1)]
+    for trial in range(60):
+        container = Container(*rng.integers(3, 12, 3))
+        features = container.enable_features(box_set, [Rotate.NOOP, Rotate.XY, Rotate.YZ])
+        for i in range(30):
+            container.drop_box(Box(*rng.integers(1, 5, 3)), tuple(rng.integers(0, 10, 2)))
+            assert (features.get_planes() == features.full_recompute()).all()
+        container.reset()
+        assert (features.get_planes() == features.full_recompute()).all()
+
+
+def test_env_obs_counts_box_set_boxes_that_fit():
+    from gym_BinPack3D.envs.BinPack3DEnv import PackingGame
+
+    box_set = [Box(1,1,1), Box(2,3,4), Box(3,3,2), Box(5,2,1)]
+    rotations = [Rotate.NOOP, Rotate.XY, Rotate.XZ]
+    env = PackingGame(container_size=(6,6,6), box_set=box_set, enabled_rotations=rotations, genFeaturePlanes=True)
+    env.seed(0)
+    rng = np.random.default_rng(0)
+    for episode in range(5):
+        obs = env.reset()
+        while True:
+            expected = 0
+            for b in box_set:
+                boxes = [ Box(b.dx, b.dy, b.dz) for r in rotations ]
+                for box, r in zip(boxes, rotations): box.rotate(r)
+                expected += any( env.container.get_possible_positions(box).any() for box in boxes )
+            assert obs["n_box_types_fit"] == expected
+            assert env.observation_space["n_box_types_fit"].contains(obs["n_box_types_fit"])
+
+            candidates = np.argwhere(obs["valid_placement_mask"])
+            if len(candidates) == 0: break
+            r, x, y = candidates[rng.integers(len(candidates))]
+            obs, reward, done, info = env.step((env.position_to_actionIdx((x, y)), rotations[r]))
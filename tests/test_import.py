@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+
+def run(snippet):
+    return subprocess.run([sys.executable, "-c", snippet], check=True, capture_output=True, text=True).stdout
+
+
+def test_core_does_not_load_gym_or_matplotlib():
+    out = run("import sys, gym_BinPack3D.core; print('gym' in sys.modules, 'matplotlib' in sys.modules)")
+    assert out.split() == ["False", "False"]
+
+
+def test_star_import_gives_packing_game():
+    out = run("from gym_BinPack3D.envs import *; print(PackingGame.__name__, Box.__name__, Rotate.__name__)")
+    assert out.split() == ["PackingGame", "Box", "Rotate"]
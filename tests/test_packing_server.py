@@ -0,0 +1,151 @@
+import asyncio
+import json
+import threading
+
+import numpy as np
+
+from gym_BinPack3D.envs.Container import Box, Rotate
+from gym_BinPack3D.envs.PackingServer import PackingServer, PackingClient
+
+
+def brute_force_best(container, size, rotations):
+    """
+    lowest resulting top, then deepest, then leftmost, over all rotations
+    return (top, x, y) or None
+    """
+    best = None
+    for r in rotations:
+        box = Box(*size)
+        box.rotate(Rotate[r])
+        for x in range(container.dx):
+            for y in range(container.dy):
+                h = container.check_box_placement_valid(box, (x, y))
+                if h < 0: continue
+                candidate = (int(h) + box.dz, x, y)
+                if best is None or candidate < best: best = candidate
+    return best
+
+
+def test_choice_matches_brute_force():
+    rng = np.random.default_rng(0)
+    rotations = ["NOOP", "XY", "XZ", "YZ"]
+    for trial in range(300):
+        server = PackingServer()
+        size = [int(v) for v in rng.integers(2, 8, 3)]
+        server.process_batch([{"op":"open", "session":"s", "container_size":size}])
+        for i in range(8):
+            box = [int(v) for v in rng.integers(1, 4, 3)]
+            rots = list(rng.choice(rotations, rng.integers(1, 5), replace=False))
+            expected = brute_force_best(server.sessions["s"], box, rots)
+            resp, = server.process_batch([{"op":"place", "session":"s", "box":box, "rotations":rots}])
+            if expected is None:
+                assert resp == {"ok":False, "error":"no_valid_placement"}
+                continue
+            top, x, y = expected
+            assert resp["ok"] and resp["position"] == [x, y]
+            placed = server.sessions["s"].boxes[-1]
+            assert placed.z + placed.dz == top
+
+
+def test_same_session_order_kept_within_batch():
+    server = PackingServer()
+    reqs = [{"op":"open",  "session":"a", "container_size":[4,4,4]},
+            {"op":"place", "session":"a", "box":[4,4,1]},
+            {"op":"open",  "session":"b", "container_size":[4,4,4]},
+            {"op":"place", "session":"a", "box":[4,4,1]},
+            {"op":"place", "session":"b", "box":[4,4,1]},
+            {"op":"close", "session":"a"},
+            {"op":"place", "session":"a", "box":[1,1,1]}]
+    results = server.process_batch(reqs)
+    assert results[1]["z"] == 0
+    assert results[3]["z"] == 1
+    assert results[4]["z"] == 0
+    assert results[6] == {"ok":False, "error":"unknown_session"}
+
+
+def run_with_server(coro_fn, **kw):
+    async def main():
+        server = PackingServer(**kw)
+        host, port = await server.start()
+        client = await PackingClient.connect(port=port)
+        try:
+            return await asyncio.wait_for(coro_fn(server, client), 10)
+        finally:
+            await client.close()
+            await server.close()
+    return asyncio.run(main())
+
+
+def test_malformed_requests_do_not_stop_server():
+    async def scenario(server, client):
+        await client.request("open", session="s", container_size=[5,5,5])
+        bad = await asyncio.gather(
+            client.request("place", session=["x"], box=[1,1,1]),
+            client.request("place", session="s", box=[1e300*1e300, 1, 1]),
+            client.request("place", session="s", box=[0, 1, 1]),
+            client.request("place", session="s", box=[1, 1, 1], rotations=["BAD"]),
+            client.request("open", session="t", container_size="abc"),
+        )
+        good = await client.request("place", session="s", box=[1,1,1])
+        return bad, good, server._batcher.done()
+
+    bad, good, batcherDone = run_with_server(scenario)
+    assert [r["error"] for r in bad] == ["bad_request"] * len(bad)
+    assert good["ok"] and good["position"] == [0, 0]
+    assert not batcherDone
+
+
+def test_request_without_op_keeps_its_id():
+    async def scenario(server, client):
+        reader, writer = await asyncio.open_connection(*server._server.sockets[0].getsockname()[:2])
+        writer.write(b'{"id": 7}\n[1, 2]\n')
+        await writer.drain()
+        resps = [ json.loads(await reader.readline()) for i in range(2) ]
+        writer.close()
+        return resps
+
+    withId, notDict = run_with_server(scenario)
+    assert withId == {"ok":False, "error":"bad_request", "id":7}
+    assert notDict == {"ok":False, "error":"bad_request"}
+
+
+def test_failure_in_batch_answers_with_internal_error():
+    async def scenario(server, client):
+        def boom(reqs): raise RuntimeError("boom")
+        server.process_batch = boom
+        # answered by id, so every request of the failed batch must get its own
+        failed = await asyncio.gather(*[ client.request("open", session=f"s{i}", container_size=[5,5,5]) for i in range(5) ])
+        del server.process_batch
+        ok = await client.request("open", session="s", container_size=[5,5,5])
+        return failed, ok
+
+    failed, ok = run_with_server(scenario, max_delay=0.05)
+    assert [r["error"] for r in failed] == ["internal_error"] * 5
+    assert ok["ok"]
+
+
+def test_full_queue_is_overloaded():
+    async def scenario(server, client):
+        await client.request("open", session="s", container_size=[10,10,10])
+
+        # hold the batcher on the first request so the next ones stay queued
+        started, release = threading.Event(), threading.Event()
+        process_batch = server.process_batch
+        def held(reqs):
+            started.set()
+            release.wait()
+            return process_batch(reqs)
+        server.process_batch = held
+
+        loop = asyncio.get_running_loop()
+        first = asyncio.ensure_future(client.request("place", session="s", box=[1,1,1]))
+        await loop.run_in_executor(None, started.wait)
+        rest = [ asyncio.ensure_future(client.request("place", session="s", box=[1,1,1])) for i in range(10) ]
+        while server.metrics.n_rejected < 7: await asyncio.sleep(0.01)
+        release.set()
+        return await asyncio.gather(first, *rest)
+
+    results = run_with_server(scenario, max_batch=1, max_queue=3)
+    errors = [r.get("error") for r in results]
+    assert errors.count(None) == 4
+    assert errors.count("overloaded") == 7